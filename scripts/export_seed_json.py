@@ -1,10 +1,13 @@
+import contextlib
 import http.server
 import json
+import os
 import sys
-import threading
 
 PORT = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
 OUTPUT = 'data/seed-data.json'
+TEMP_OUTPUT = OUTPUT + '.tmp'
+CHUNK_SIZE = 64 * 1024
 
 class Handler(http.server.BaseHTTPRequestHandler):
     def do_POST(self):
@@ -13,19 +16,31 @@ class Handler(http.server.BaseHTTPRequestHandler):
             self.end_headers()
             self.wfile.write(b'Not Found')
             return
-        length = int(self.headers.get('Content-Length', '0'))
-        body = self.rfile.read(length)
+        remaining = int(self.headers.get('Content-Length', '0'))
         try:
-            decoded = body.decode('utf-8')
-        except UnicodeDecodeError:
-            decoded = body.decode('utf-8', 'replace')
-        with open(OUTPUT, 'w', encoding='utf-8') as fh:
-            fh.write(decoded)
+            with open(TEMP_OUTPUT, 'wb') as fh:
+                while remaining > 0:
+                    chunk = self.rfile.read(min(CHUNK_SIZE, remaining))
+                    if not chunk:
+                        break
+                    fh.write(chunk)
+                    remaining -= len(chunk)
+        finally:
+            if remaining > 0:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(TEMP_OUTPUT)
+        if remaining > 0:
+            self.send_response(400)
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+            self.wfile.write(b'Incomplete body')
+            return
+        os.replace(TEMP_OUTPUT, OUTPUT)
         self.send_response(200)
         self.send_header('Access-Control-Allow-Origin', '*')
         self.end_headers()
         self.wfile.write(b'OK')
-        threading.Thread(target=self.server.shutdown).start()
+        self.server.received = True
 
     def log_message(self, format, *args):
         return
@@ -33,7 +48,10 @@ class Handler(http.server.BaseHTTPRequestHandler):
 if __name__ == '__main__':
     print(f'Listening on http://127.0.0.1:{PORT}/data to receive seed JSON...')
     server = http.server.HTTPServer(('127.0.0.1', PORT), Handler)
+    server.received = False
     try:
-        server.serve_forever()
+        # 404s and incomplete uploads (400) leave the server listening.
+        while not server.received:
+            server.handle_request()
     finally:
         print('Server shutting down')
@@ -1,57 +1,101 @@
+import io
 import json
 import urllib.request
 import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 COMPLAINTS_URL = 'https://pie.med.utoronto.ca/DC/DC_content/assets/xml/complaints.xml'
 DIAGNOSES_URL = 'https://pie.med.utoronto.ca/DC/DC_content/assets/xml/diagnoses.xml'
 OUTPUT = 'data/seed-data.json'
+USER_AGENT = 'ddx-seed-updater'
+TIMEOUT = 30
 
 
 def fetch(url):
     print(f'Fetching {url}...')
-    with urllib.request.urlopen(url) as resp:
+    req = urllib.request.Request(url, headers={'User-Agent': USER_AGENT})
+    with urllib.request.urlopen(req, timeout=TIMEOUT) as resp:
         return resp.read()
 
 
+def iter_records(data, tag):
+    """Yield each outermost ``tag`` element, detaching it once processed."""
+    stack = []
+    depth = 0
+    for event, elem in ET.iterparse(io.BytesIO(data), events=('start', 'end')):
+        if event == 'start':
+            stack.append(elem)
+            if elem.tag == tag:
+                depth += 1
+            continue
+        stack.pop()
+        if elem.tag != tag:
+            continue
+        depth -= 1
+        if depth == 0:
+            yield elem
+            if stack:
+                stack[-1].remove(elem)
+
+
 def parse_diagnoses(data):
-    root = ET.fromstring(data)
-    return {diag.attrib['CODE']: diag.attrib.get('VALUE', '') for diag in root.findall('.//DIAGNOSIS')}
+    result = {}
+    for record in iter_records(data, 'DIAGNOSIS'):
+        for diag in record.iter('DIAGNOSIS'):
+            result[diag.attrib['CODE']] = diag.attrib.get('VALUE', '')
+    return result
 
 
 def parse_complaints(data, diag_map):
-    root = ET.fromstring(data)
     result = {}
-    for complaint in root.findall('.//COMPLAINT'):
-        symptom = complaint.attrib.get('VALUE', '').strip()
-        if not symptom:
-            continue
-        freq = []
-        do_not_miss = []
-        commonly_missed = []
-        for diag in complaint.findall('.//DIAGNOSIS'):
-            code = diag.attrib.get('CODE')
-            name = diag_map.get(code, f'Unknown ({code})')
-            freq.append(name)
-            if diag.attrib.get('DO_NOT_MISS', '').lower() == 'true':
-                do_not_miss.append(name)
-            if diag.attrib.get('COMMONLY_MISSED', '').lower() == 'true':
-                commonly_missed.append(name)
-        result[symptom] = {
-            'frequency': freq,
-            'doNotMiss': do_not_miss,
-            'commonlyMissed': commonly_missed,
-            'source': 'University of Toronto Diagnostic Checklist'
-        }
+    for record in iter_records(data, 'COMPLAINT'):
+        for complaint in record.iter('COMPLAINT'):
+            symptom = complaint.attrib.get('VALUE', '').strip()
+            if not symptom:
+                continue
+            freq = []
+            do_not_miss = []
+            commonly_missed = []
+            for diag in complaint.iter('DIAGNOSIS'):
+                code = diag.attrib.get('CODE')
+                name = diag_map.get(code, f'Unknown ({code})')
+                freq.append(name)
+                if diag.attrib.get('DO_NOT_MISS', '').lower() == 'true':
+                    do_not_miss.append(name)
+                if diag.attrib.get('COMMONLY_MISSED', '').lower() == 'true':
+                    commonly_missed.append(name)
+            result[symptom] = {
+                'frequency': freq,
+                'doNotMiss': do_not_miss,
+                'commonlyMissed': commonly_missed,
+                'source': 'University of Toronto Diagnostic Checklist'
+            }
     return result
 
 
+def write_payload(payload):
+    if orjson is not None:
+        with open(OUTPUT, 'wb') as fh:
+            fh.write(orjson.dumps(payload, option=orjson.OPT_INDENT_2))
+        return
+    with open(OUTPUT, 'w', encoding='utf-8') as fh:
+        json.dump(payload, fh, indent=2, ensure_ascii=False)
+
+
 def main():
-    complaints_data = fetch(COMPLAINTS_URL)
-    diagnoses_data = fetch(DIAGNOSES_URL)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        complaints_future = pool.submit(fetch, COMPLAINTS_URL)
+        diagnoses_future = pool.submit(fetch, DIAGNOSES_URL)
+        complaints_data = complaints_future.result()
+        diagnoses_data = diagnoses_future.result()
     diag_map = parse_diagnoses(diagnoses_data)
     payload = parse_complaints(complaints_data, diag_map)
-    with open(OUTPUT, 'w', encoding='utf-8') as fh:
-        json.dump(payload, fh, indent=2, ensure_ascii=False)
+    write_payload(payload)
     print(f'Wrote {len(payload)} entries to {OUTPUT}')
 
 